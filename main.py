@@ -5,65 +5,173 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__))) 
 
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File 
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse, Response, FileResponse
 from fastapi.templating import Jinja2Templates
 from fastapi.staticfiles import StaticFiles
 from starlette import status
+import anyio
+from pydantic import BaseModel
+from typing import Literal
 import uvicorn
 import sqlite3
-import hashlib 
-import shutil 
-# Removed: import easyocr (No longer directly used here)
+import hashlib
+import hmac
+import functools
+import logging
+import logging.handlers
+import queue
+import threading
+
+# --- Logging ---
+# Handlers hang off a QueueHandler, so the request path only pays a lock-free
+# enqueue; a background QueueListener thread does the formatting and stream
+# I/O that print() used to do synchronously (and unbuffered) per call.
+log = logging.getLogger("healthmate")
+
+def _setup_logging() -> logging.handlers.QueueListener:
+    log_queue = queue.SimpleQueue()
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream, respect_handler_level=True)
+    listener.start()
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(logging.INFO)
+    return listener
+
+_LOG_LISTENER = _setup_logging()
 
 # Import the external module (Should now work consistently)
 try:
-    from analizerend.analizer import analyze_prescription_image 
-    # Use a flag instead of printing success/failure here
+    from analizerend.analizer import analyze_prescription_bytes, initialize_ocr_reader
+    # Use a flag instead of logging success/failure here
     ANALYZER_AVAILABLE = True
 except ImportError:
-    print("ANALYZEREND: Module not found during startup. AI features will fail.")
+    log.warning("ANALYZEREND: Module not found during startup. AI features will fail.")
     ANALYZER_AVAILABLE = False
 except Exception as e:
-    print(f"ANALYZEREND: Module failed during startup: {e}. AI features will fail.")
+    log.warning("ANALYZEREND: Module failed during startup: %s. AI features will fail.", e)
     ANALYZER_AVAILABLE = False
 
 
+# Prescription uploads larger than this are rejected before analysis
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
 # --- Database Configuration ---
 DATABASE_FILE = "healthmate.db"
 STARTING_UID = 10000
 
-# --- Security Configuration (Using SHA-256) ---
+# Hot-path statements as module constants: one string object for the
+# lifetime of the process, so sqlite3's statement cache always hits and the
+# SQL text is never rebuilt per request.
+SQL_FIND_USER_BY_EMAIL = "SELECT uid, password, name, role FROM users WHERE email = ?"
+SQL_FIND_NAME_BY_UID = "SELECT name FROM users WHERE uid = ?"
+SQL_INSERT_USER = (
+    "INSERT INTO users (name, email, phone, password, role) VALUES (?, ?, ?, ?, ?) "
+    "ON CONFLICT(email) DO NOTHING RETURNING uid"
+)
+
+# --- Security Configuration (Argon2 with legacy SHA-256 fallback) ---
+
+# Argon2id is salted and memory-hard with a calibrated work factor; the old
+# raw SHA-256 scheme is kept only as a fallback for environments without
+# argon2-cffi and for verifying rows hashed before the migration.
+try:
+    from argon2 import PasswordHasher
+    PASSWORD_HASHER = PasswordHasher(time_cost=2, memory_cost=65536, parallelism=1)
+except ImportError:
+    log.warning("SECURITY: argon2-cffi not installed. Falling back to legacy SHA-256 hashing.")
+    PASSWORD_HASHER = None
 
 def get_password_hash(password: str) -> str:
-    """Hashes the password using SHA-256."""
+    """Hashes the password (Argon2id when available, legacy SHA-256 otherwise)."""
+    if PASSWORD_HASHER is not None:
+        return PASSWORD_HASHER.hash(password)
     return hashlib.sha256(password.encode('utf-8')).hexdigest()
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifies a plain password against a stored hash."""
-    return get_password_hash(plain_password) == hashlib.sha256(plain_password.encode('utf-8')).hexdigest() # Corrected to use hash function directly
+    """Verifies a plain password against a stored hash (either scheme)."""
+    if PASSWORD_HASHER is not None and hashed_password.startswith('$argon2'):
+        try:
+            return PASSWORD_HASHER.verify(hashed_password, plain_password)
+        except Exception:
+            return False
+    # Legacy rows (and the no-argon2 fallback) are unsalted SHA-256 hex;
+    # compare in constant time so mismatch position can't leak via timing.
+    computed = hashlib.sha256(plain_password.encode('utf-8')).hexdigest()
+    return hmac.compare_digest(computed, hashed_password)
+
+async def upgrade_password_hash_if_needed(db, uid: int, plain_password: str, stored_hash: str):
+    """
+    Transparently rehashes a legacy SHA-256 row with Argon2id after a
+    successful login — the only moment the plaintext is available — so old
+    accounts migrate to the salted scheme without a reset campaign.
+    """
+    if PASSWORD_HASHER is None or stored_hash.startswith('$argon2'):
+        return
+    # Hash on a worker thread and before taking the write lock — Argon2id
+    # costs tens of ms by design, far too long to hold the global lock or
+    # stall the event loop for.
+    new_hash = await anyio.to_thread.run_sync(PASSWORD_HASHER.hash, plain_password)
+    with DB_WRITE_LOCK:
+        db.execute(
+            "UPDATE users SET password = ? WHERE uid = ?",
+            (new_hash, uid)
+        )
+        db.commit()
 
-def get_db():
-    """Dependency to get a database connection."""
+# One long-lived connection per worker: connecting per request paid file-open,
+# journal-check and pragma-parse syscalls on every hit and threw away SQLite's
+# page cache each time. WAL mode lets readers proceed alongside a writer;
+# writes still go through DB_WRITE_LOCK since SQLite serializes them anyway.
+_DB_CONN = None
+_DB_CONN_LOCK = threading.Lock()
+DB_WRITE_LOCK = threading.Lock()
+
+def _connect_db() -> sqlite3.Connection:
+    """Opens the shared connection and applies the session pragmas once."""
     conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
-    conn.row_factory = sqlite3.Row  
-    try:
-        yield conn
-    finally:
-        conn.close()
+    conn.row_factory = sqlite3.Row
+    conn.executescript(
+        "PRAGMA journal_mode=WAL;"
+        "PRAGMA synchronous=NORMAL;"
+        "PRAGMA cache_size=-20000;"
+        "PRAGMA temp_store=MEMORY;"
+    )
+    return conn
+
+def get_db():
+    """Dependency yielding the shared, long-lived database connection."""
+    global _DB_CONN
+    if _DB_CONN is None:
+        with _DB_CONN_LOCK:
+            if _DB_CONN is None:
+                _DB_CONN = _connect_db()
+    yield _DB_CONN
 
 def create_db_table():
     """
     Creates the users and doctors tables (users table holds all data).
     Data persistence is maintained (no DROP TABLE commands).
     """
-    print(f"Checking/Creating database file: {DATABASE_FILE}")
+    log.info("Checking/Creating database file: %s", DATABASE_FILE)
     conn = sqlite3.connect(DATABASE_FILE, check_same_thread=False)
     try:
+        # Detect a legacy users table (separate id column, manually assigned
+        # uid) so its rows can be carried over to the AUTOINCREMENT layout.
+        legacy_users = False
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name='users'").fetchone():
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(users)")}
+            if 'id' in columns:
+                conn.execute("ALTER TABLE users RENAME TO users_legacy")
+                legacy_users = True
+
         # 1. Users Table (Patients & Doctors - Single Source of Truth)
+        # uid is the AUTOINCREMENT primary key: SQLite assigns it atomically
+        # with the insert, replacing the old SELECT MAX(uid) + 1 scan.
         conn.execute("""
             CREATE TABLE IF NOT EXISTS users (
-                id INTEGER PRIMARY KEY,
-                uid INTEGER UNIQUE NOT NULL,
+                uid INTEGER PRIMARY KEY AUTOINCREMENT,
                 name TEXT NOT NULL,
                 email TEXT UNIQUE NOT NULL,
                 phone TEXT,
@@ -71,6 +179,27 @@ def create_db_table():
                 role TEXT NOT NULL DEFAULT 'user'
             )
         """)
+
+        if legacy_users:
+            conn.execute("""
+                INSERT INTO users (uid, name, email, phone, password, role)
+                SELECT uid, name, email, phone, password, role FROM users_legacy
+            """)
+            conn.execute("DROP TABLE users_legacy")
+            log.info("Migrated legacy users table to AUTOINCREMENT uid schema.")
+
+        # Seed or raise the sequence so the next user never gets a uid below
+        # STARTING_UID. The floor must be enforced, not just seeded: the
+        # legacy INSERT..SELECT above leaves a ('users', 0) sequence row even
+        # when it copies zero rows, and migrated rows may themselves sit
+        # below the floor. (sqlite_sequence has no unique index, so this is
+        # an UPDATE-then-INSERT rather than an upsert.)
+        updated = conn.execute(
+            "UPDATE sqlite_sequence SET seq = max(seq, ?) WHERE name = 'users'",
+            (STARTING_UID - 1,)
+        )
+        if updated.rowcount == 0:
+            conn.execute("INSERT INTO sqlite_sequence (name, seq) VALUES ('users', ?)", (STARTING_UID - 1,))
         
         # 2. Doctors Table (Kept for potential future use, but not for primary data insertion)
         conn.execute("""
@@ -85,31 +214,38 @@ def create_db_table():
             )
         """)
         
+        # Covering index for the hot dashboard lookup (SELECT name ... WHERE
+        # uid = ?): the query is answered from the index alone, no table
+        # probe. Email lookups are already covered by the UNIQUE constraint.
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_users_uid_name ON users (uid, name)")
+
+        # Refresh planner statistics so SQLite picks these indexes
+        conn.execute("ANALYZE")
+
         conn.commit()
     finally:
         conn.close()
 
-def get_next_uid(db: sqlite3.Connection) -> int:
-    """Calculates the next sequential user ID (uid) based on the USERS table."""
-    cursor = db.execute("SELECT MAX(uid) FROM users").fetchone()
-    max_uid = cursor[0] if cursor and cursor[0] is not None else 0
-    if max_uid < STARTING_UID:
-        return STARTING_UID
-    return max_uid + 1
+# orjson (Rust) serializes these small payloads several times faster than the
+# stdlib json module and emits bytes directly; fall back to the standard
+# JSONResponse when it isn't installed.
+try:
+    import orjson  # noqa: F401 -- probed so ORJSONResponse has its backend
+    from fastapi.responses import ORJSONResponse as APIJSONResponse
+except ImportError:
+    APIJSONResponse = JSONResponse
 
 # --- FastAPI Initialization ---
-app = FastAPI(title="HealthMate AI")
+app = FastAPI(title="HealthMate AI", default_response_class=APIJSONResponse)
 
 # Initialize database
 create_db_table()
 
-# Ensure directories exist
-if not os.path.exists("static"):
-    os.makedirs("static")
-if not os.path.exists("uploads"): # Directory for temporary file uploads
-    os.makedirs("uploads")
-if not os.path.exists("templates"):
-    os.makedirs("templates")
+# Ensure directories exist. exist_ok lets the filesystem answer in one call
+# instead of a stat-then-create pair per directory; uploads/ is gone now that
+# analysis runs fully in memory.
+for _dir in ("static", "templates"):
+    os.makedirs(_dir, exist_ok=True)
 
 # Configure templates directory
 templates = Jinja2Templates(directory="templates")
@@ -124,6 +260,91 @@ def get_template_context(request: Request, user_name: str = "Anonymous", uid: in
     error = request.query_params.get("error")
     return {"request": request, "user_name": user_name, "uid": uid, "error": error}
 
+@functools.lru_cache(maxsize=64)
+def render_static_page(template_name: str, error: str | None = None) -> str:
+    """
+    Renders an anonymous page once per (template, error) pair and caches the
+    HTML. These pages have no per-user content — none of the templates touch
+    request or url_for — so re-running Jinja2 per hit only re-produced the
+    same bytes.
+    """
+    template = templates.get_template(template_name)
+    return template.render(request=None, user_name="Anonymous", uid=None, error=error)
+
+@functools.lru_cache(maxsize=64)
+def _static_page_etag(template_name: str, error: str | None = None) -> str:
+    """Strong ETag over the cached page HTML (cheap 8-byte blake2b digest)."""
+    html = render_static_page(template_name, error)
+    return '"' + hashlib.blake2b(html.encode('utf-8'), digest_size=8).hexdigest() + '"'
+
+def static_page_response(request: Request, template_name: str) -> Response:
+    """
+    Serves an anonymous page with ETag/Cache-Control headers. Matching
+    If-None-Match requests get an empty 304 instead of the full body, so
+    revalidations cost a hash comparison rather than a page transfer.
+    """
+    error = request.query_params.get("error")
+    etag = _static_page_etag(template_name, error)
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=300"}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    # The error=None variant was prerendered to disk at startup; FileResponse
+    # hands the file descriptor to the server's sendfile path, skipping both
+    # Jinja and the Python-level body copy. Error-banner variants fall back
+    # to the in-memory render cache.
+    prerendered = PRERENDERED_PAGES.get(template_name)
+    if error is None and prerendered is not None:
+        return FileResponse(prerendered, media_type="text/html",
+                            stat_result=PRERENDERED_STATS[template_name], headers=headers)
+    return HTMLResponse(render_static_page(template_name, error), headers=headers)
+
+@app.on_event("startup")
+async def warm_ocr_reader():
+    """
+    Warms the OCR reader in the background at server startup so the first
+    prescription upload doesn't pay the multi-second model load. Import time
+    stays fast — the reader itself is still built lazily inside the analyzer.
+    """
+    if ANALYZER_AVAILABLE:
+        threading.Thread(target=initialize_ocr_reader, daemon=True).start()
+
+
+@app.on_event("startup")
+async def size_worker_thread_pool():
+    """
+    Sizes the shared worker-thread pool to the machine. The analysis offload
+    and Starlette's sync offloads both draw from anyio's default limiter
+    (fixed at 40 tokens), which is far more CPU-bound OCR work than small
+    hosts can run.
+    """
+    anyio.to_thread.current_default_thread_limiter().total_tokens = max(4, os.cpu_count() or 1)
+
+
+# Anonymous pages prerendered to disk at startup: template name -> file path
+# and its cached stat result (FileResponse then skips the per-request stat).
+STATIC_PAGE_TEMPLATES = ("index.html", "login.html", "signup.html", "diet.html",
+                         "lifestyle.html", "contacts.html", "learn.html")
+PRERENDERED_PAGES: dict[str, str] = {}
+PRERENDERED_STATS: dict[str, os.stat_result] = {}
+
+@app.on_event("startup")
+async def prerender_static_pages():
+    """
+    Renders the error-free variant of each anonymous page to
+    static/_prerendered/ once at startup. Serving them with FileResponse
+    takes Jinja out of these GETs entirely and lets the server use its
+    zero-copy file path for the body.
+    """
+    out_dir = os.path.join("static", "_prerendered")
+    os.makedirs(out_dir, exist_ok=True)
+    for name in STATIC_PAGE_TEMPLATES:
+        path = os.path.join(out_dir, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(render_static_page(name))
+        PRERENDERED_PAGES[name] = path
+        PRERENDERED_STATS[name] = os.stat(path)
+
+
 # --- API ENDPOINT FOR AI/ML FEATURE ---
 
 @app.post("/api/analyze-prescription")
@@ -134,23 +355,35 @@ async def analyze_prescription_endpoint(file: UploadFile = File(...)):
     """
     
     if not ANALYZER_AVAILABLE:
-        return JSONResponse(
+        return APIJSONResponse(
             {"message": "Analysis failed: AI module not initialized.", "medications": ["Error: AI module unavailable."], "interactions": [], "accuracy_score": 0.0},
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE
         )
-        
-    file_location = f"uploads/{file.filename}"
-    
     try:
-        # 1. Save the uploaded file to disk
-        with open(file_location, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # 2. Run the external analysis function (returns dictionary)
-        analysis_result = analyze_prescription_image(file_location)
+        # 1. Read the upload in 1 MiB chunks, rejecting oversized files
+        # early. The image never touches the filesystem: the analyzer
+        # consumes the raw bytes directly.
+        chunks = []
+        total = 0
+        while chunk := await file.read(1024 * 1024):
+            total += len(chunk)
+            if total > MAX_UPLOAD_BYTES:
+                return APIJSONResponse(
+                    {"message": "Analysis failed: file exceeds the upload size limit.", "medications": ["Error: File too large."], "interactions": [], "accuracy_score": 0.0},
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+                )
+            chunks.append(chunk)
+        file_bytes = b"".join(chunks)
+
+        # 2. Run the external analysis function (returns dictionary) on a
+        # worker thread — it blocks on OpenCV/PaddleOCR for hundreds of ms
+        # and would otherwise stall the event loop for every other route.
+        # anyio's pool is used (not asyncio's default executor) so the
+        # CPU-sized limiter from startup genuinely bounds OCR concurrency.
+        analysis_result = await anyio.to_thread.run_sync(analyze_prescription_bytes, file_bytes)
         
         # 3. Return the full dictionary structure, ensuring all fields are present
-        return JSONResponse(
+        return APIJSONResponse(
             {
                 "message": "Analysis complete.", 
                 "medications": analysis_result.get("medications", []),
@@ -161,15 +394,11 @@ async def analyze_prescription_endpoint(file: UploadFile = File(...)):
             status_code=status.HTTP_200_OK
         )
     except Exception as e:
-        print(f"Error processing prescription file: {e}")
-        return JSONResponse(
+        log.exception("Error processing prescription file: %s", e)
+        return APIJSONResponse(
             {"message": f"Analysis failed: {e}", "medications": ["Error processing image."], "interactions": [], "accuracy_score": 0.0},
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
-    finally:
-        # 4. Clean up temporary file
-        if os.path.exists(file_location):
-            os.remove(file_location)
 
 
 # --- Core Routes ---
@@ -177,14 +406,12 @@ async def analyze_prescription_endpoint(file: UploadFile = File(...)):
 @app.get("/", response_class=HTMLResponse, tags=["Views"])
 async def read_root(request: Request):
     """Landing page view (index.html)."""
-    context = get_template_context(request)
-    return templates.TemplateResponse("index.html", context)
+    return static_page_response(request, "index.html")
 
 @app.get("/login", response_class=HTMLResponse, tags=["Views"])
 async def read_login(request: Request):
     """User login page."""
-    context = get_template_context(request)
-    return templates.TemplateResponse("login.html", context)
+    return static_page_response(request, "login.html")
 
 @app.post("/login")
 async def login_user(
@@ -195,20 +422,20 @@ async def login_user(
 ):
     """Handles user login, checking against the USERS table and verifying role."""
     
-    cursor = db.execute(
-        "SELECT uid, password, name, role FROM users WHERE email = ?",
-        (email,)
-    )
+    cursor = db.execute(SQL_FIND_USER_BY_EMAIL, (email,))
     user = cursor.fetchone()
     
-    if user and verify_password(password, user['password']):
+    # Argon2id verification is deliberately slow (tens of ms) — run it on a
+    # worker thread so concurrent requests aren't stalled behind it
+    if user and await anyio.to_thread.run_sync(verify_password, password, user['password']):
+        await upgrade_password_hash_if_needed(db, user['uid'], password, user['password'])
         if user['role'] == role:
-            print(f"User logged in: UID {user['uid']}, Role: {user['role']}")
+            log.info("User logged in: UID %s, Role: %s", user['uid'], user['role'])
             redirect_path = "/doctor_dashboard" if user['role'] == 'doctor' else "/dashboard"
             return RedirectResponse(f"{redirect_path}?uid={user['uid']}", status_code=status.HTTP_303_SEE_OTHER)
         else:
             error_message = f"Role mismatch. Please confirm you are logging in as a {user['role']}."
-            print(f"Login failed: Role mismatch for {email}. Stored role: {user['role']}, Submitted role: {role}")
+            log.info("Login failed: Role mismatch for %s. Stored role: %s, Submitted role: %s", email, user['role'], role)
     else:
         error_message = "Invalid email or password."
 
@@ -218,71 +445,72 @@ async def login_user(
 @app.get("/signup", response_class=HTMLResponse, tags=["Views"])
 async def read_signup(request: Request):
     """User registration page."""
-    context = get_template_context(request)
-    return templates.TemplateResponse("signup.html", context)
+    return static_page_response(request, "signup.html")
+
+class SignupIn(BaseModel):
+    """
+    Signup payload. Parsing and validation run in pydantic-core (compiled
+    Rust) before the handler body executes, replacing the manual
+    request.json() + .get() chain. email stays a plain str — EmailStr would
+    pull in the optional email-validator dependency for a field the frontend
+    already constrains.
+    """
+    name: str
+    email: str
+    phone: str | None = None
+    password: str
+    confirm_password: str
+    role: Literal['user', 'doctor'] = 'user'
 
 @app.post("/signup")
 async def signup_user(
-    request: Request,
+    payload: SignupIn,
     db: sqlite3.Connection = Depends(get_db),
 ):
     """
     Handles user signup: inserts ALL data into the 'users' table.
     """
-    
-    try:
-        data = await request.json()
-        name = data.get('name')
-        email = data.get('email')
-        phone = data.get('phone')
-        password = data.get('password')
-        confirm_password = data.get('confirm_password')
-        role = data.get('role', 'user') 
-
-    except Exception:
-        return JSONResponse(
-            {"message": "Invalid data format."},
-            status_code=status.HTTP_400_BAD_REQUEST
-        )
 
-    if password != confirm_password:
-        return JSONResponse(
+    name, email, phone = payload.name, payload.email, payload.phone
+    password, role = payload.password, payload.role
+
+    if password != payload.confirm_password:
+        return APIJSONResponse(
             {"message": "Passwords do not match."},
             status_code=status.HTTP_400_BAD_REQUEST
         )
-    
-    if role not in ['user', 'doctor']:
-        role = 'user'
-    
+
     redirect_path = '/doctor_dashboard' if role == 'doctor' else '/dashboard'
-    table_name = 'users' 
 
     try:
-        password_hash = get_password_hash(password)
-        next_uid = get_next_uid(db) 
-        
-        db.execute(
-            f"INSERT INTO {table_name} (uid, name, email, phone, password, role) VALUES (?, ?, ?, ?, ?, ?)",
-            (next_uid, name, email, phone, password_hash, role)
-        )
-        db.commit()
-        
-        print(f"New user registered: UID {next_uid}, Email: {email}, Role: {role}")
-        
-        return JSONResponse(
+        # Same event-loop hygiene as login: the Argon2id hash runs off-loop
+        password_hash = await anyio.to_thread.run_sync(get_password_hash, password)
+
+        with DB_WRITE_LOCK:
+            # One statement: uid comes from AUTOINCREMENT via RETURNING, and
+            # a duplicate email yields no row instead of raising — the
+            # conflict is handled without an exception round trip.
+            cursor = db.execute(SQL_INSERT_USER, (name, email, phone, password_hash, role))
+            row = cursor.fetchone()
+            db.commit()
+
+        if row is None:
+            return APIJSONResponse(
+                {"message": "This email is already registered in the system. Please login instead."},
+                status_code=status.HTTP_409_CONFLICT
+            )
+
+        next_uid = row['uid']
+        log.info("New user registered: UID %s, Email: %s, Role: %s", next_uid, email, role)
+
+        return APIJSONResponse(
             {"message": "Registration successful. Redirecting...", "redirect_url": f"{redirect_path}?uid={next_uid}"},
             status_code=status.HTTP_201_CREATED
         )
 
-    except sqlite3.IntegrityError:
-        return JSONResponse(
-            {"message": "This email is already registered in the system. Please login instead."},
-            status_code=status.HTTP_409_CONFLICT
-        )
-
     except Exception as e:
-        print(f"!!! CRITICAL SERVER CRASH: {e}")
-        return JSONResponse(
+        log.exception("!!! CRITICAL SERVER CRASH: %s", e)
+        return APIJSONResponse(
             {"message": "An unexpected server error occurred."},
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
@@ -299,7 +527,7 @@ async def read_dashboard(
     user_name = "Anonymous"
     user_uid = uid
     if uid:
-        cursor = db.execute("SELECT name FROM users WHERE uid = ?", (uid,))
+        cursor = db.execute(SQL_FIND_NAME_BY_UID, (uid,))
         user = cursor.fetchone()
         if user:
             user_name = user['name']
@@ -318,7 +546,7 @@ async def read_doctor_dashboard(
     user_name = "Anonymous"
     user_uid = uid
     if uid:
-        cursor = db.execute("SELECT name FROM users WHERE uid = ?", (uid,))
+        cursor = db.execute(SQL_FIND_NAME_BY_UID, (uid,))
         user = cursor.fetchone()
         if user:
             user_name = user['name']
@@ -341,7 +569,7 @@ async def read_prescription_analysis(
     
     if uid_str and uid_str.isdigit():
         user_uid = int(uid_str)
-        cursor = db.execute("SELECT name FROM users WHERE uid = ?", (user_uid,))
+        cursor = db.execute(SQL_FIND_NAME_BY_UID, (user_uid,))
         user = cursor.fetchone()
         if user:
             user_name = user['name']
@@ -351,27 +579,28 @@ async def read_prescription_analysis(
 
 @app.get("/diet", response_class=HTMLResponse, tags=["Views"])
 async def read_diet_plan(request: Request):
-    context = get_template_context(request)
-    return templates.TemplateResponse("diet.html", context)
+    return static_page_response(request, "diet.html")
 
 @app.get("/lifestyle", response_class=HTMLResponse, tags=["Views"])
 async def read_lifestyle_tracker(request: Request):
-    context = get_template_context(request)
-    return templates.TemplateResponse("lifestyle.html", context)
+    return static_page_response(request, "lifestyle.html")
 
 @app.get("/contact", response_class=HTMLResponse, tags=["Views"])
 async def read_contact_page(request: Request):
-    context = get_template_context(request)
-    return templates.TemplateResponse("contacts.html", context)
+    return static_page_response(request, "contacts.html")
 
 
 @app.get("/learn", response_class=HTMLResponse, tags=["Views"])
 async def read_learn_more(request: Request):
-    context = get_template_context(request)
-    return templates.TemplateResponse("learn.html", context)
+    return static_page_response(request, "learn.html")
 
 
 if __name__ == "__main__":
-    if not os.path.exists("templates"):
-        os.makedirs("templates")
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    import importlib.util
+
+    # uvloop and httptools cut event-loop and HTTP-parsing overhead
+    # substantially; fall back to the pure-Python implementations (asyncio
+    # loop, h11 parser) when they aren't installed, e.g. on Windows.
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "auto"
+    http = "httptools" if importlib.util.find_spec("httptools") else "auto"
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True, loop=loop, http=http)